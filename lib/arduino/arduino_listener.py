@@ -1,43 +1,57 @@
 import serial
+import os
 import time
-import pyautogui
 
 # Replace this with the port your Arduino is on!
 ARDUINO_PORT = '/dev/cu.usbserial-210'
 BAUD_RATE = 9600
 
+# Set ARDUINO_DEBUG=1 to echo every line received from the Arduino
+DEBUG = os.environ.get("ARDUINO_DEBUG") == "1"
+
 print("Connecting to Arduino...")
 
 try:
     # Set up the serial connection
     ser = serial.Serial(ARDUINO_PORT, BAUD_RATE, timeout=1)
-    # A short delay to allow the connection to establish
-    time.sleep(2) 
+    # A short delay to allow the connection to establish. pyautogui is slow to import, so load it
+    # during that delay rather than on the first PLAY (and fail at startup if it's missing).
+    settle_until = time.monotonic() + 2
+    import pyautogui
+    time.sleep(max(0, settle_until - time.monotonic()))
     print("Connected! Listening for commands...")
 
+    # Bytes received but not yet terminated by a newline
+    pending = b""
+
     # Infinite loop to keep listening
     while True:
-        # Read a line from the serial port
-        line = ser.readline()
+        # Read everything the serial port has buffered in one call (waits up to the read timeout)
+        pending += ser.read(max(1, ser.in_waiting))
         
-        # If a line was received
-        if line:
-            # Decode bytes to a string and remove whitespace
-            message = line.decode('utf-8').strip()
+        # Process every complete line received so far
+        while (newline := pending.find(b"\n")) != -1:
+            line, pending = pending[:newline + 1], pending[newline + 1:]
+            
+            # Skip blank/keep-alive lines before paying for any decoding
+            if line.isspace():
+                continue
             
             # Print all messages to console for debugging
-            print(f"Arduino: {message}")
+            if DEBUG:
+                print(f"Arduino: {line.decode('utf-8').strip()}")
             
-            # Check if we got our "PLAY" command
-            if message == "PLAY":
+            # Check if we got our "PLAY" command (compared as raw bytes, no decode needed)
+            if line.strip() == b"PLAY":
                 print("Detected 'PLAY' command -> Triggering click")
-                # pyautogui.press('space')
                 pyautogui.click(x=200, y=200) # Click at specific coordinates
 
 except serial.SerialException as e:
     print(f"Error: Could not open port {ARDUINO_PORT}. {e}")
 except FileNotFoundError:
     print(f"Error: Port {ARDUINO_PORT} not found. Is the Arduino connected?")
+except ImportError as e:
+    print(f"Error: {e}. Install it with: pip3 install pyautogui")
 except KeyboardInterrupt:
     print("\nStopping Arduino listener...")
     if 'ser' in locals():
@@ -1,18 +1,112 @@
 import serial
 import os
 import time
-from datetime import datetime
+import atexit
+import queue
+import threading
 
 # Replace this with the port your Arduino is on!
 ARDUINO_PORT = '/dev/cu.usbserial-210'
 BAUD_RATE = 9600
 LOG_FILE_PATH = 'assets/arduino.log'
+LOG_QUEUE_SIZE = 1024     # records waiting for the writer thread before new ones are dropped
+DROP_REPORT_INTERVAL = 1  # seconds between warnings while records are being dropped
+
+# Set ARDUINO_DEBUG=1 to echo every line received from the Arduino
+DEBUG = os.environ.get("ARDUINO_DEBUG") == "1"
 
 print("Connecting to Arduino for logging...")
 
 # Create log directory if it doesn't exist
 os.makedirs(os.path.dirname(LOG_FILE_PATH), exist_ok=True)
 
+# Keep the log file open for the whole run. Records are appended straight from their
+# segments with writev, so there is no Python-side buffer or text encoding in between.
+log_fd = os.open(LOG_FILE_PATH, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+# Upper bound on the number of segments a single writev call accepts
+IOV_MAX = os.sysconf('SC_IOV_MAX') if 'SC_IOV_MAX' in os.sysconf_names else 1024
+
+# Records travel from the serial loop to the writer thread as (timestamp prefix, message bytes, is PLAY)
+# so a slow SD card never stalls serial reads. None tells the writer to stop.
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+
+def log_writer():
+    """Write queued records in batches, one writev call per batch"""
+    running = True
+    write_failed = False
+    
+    while running:
+        # Wait for the next record, then grab everything else that queued up in the meantime
+        batch = [log_queue.get()]
+        while True:
+            try:
+                batch.append(log_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        # Each record is written as "[timestamp] ", the message and a newline
+        segments = []
+        play_logged = False
+        for record in batch:
+            if record is None:
+                running = False
+                continue
+            prefix, message_bytes, is_play = record
+            segments += (prefix, message_bytes, b"\n")
+            play_logged = play_logged or is_play
+        
+        if not segments:
+            continue
+        
+        # Let the kernel gather the segments instead of concatenating them first.
+        # A failed write (full or failing SD card) drops this batch but keeps the thread
+        # draining the queue, so the serial loop and the exit handler never block on it.
+        try:
+            for start in range(0, len(segments), IOV_MAX):
+                os.writev(log_fd, segments[start:start + IOV_MAX])
+        except OSError as e:
+            if not write_failed:
+                print(f"Error: Could not write to {LOG_FILE_PATH}, dropping log records. {e}")
+                write_failed = True
+            continue
+        
+        if write_failed:
+            print(f"Writing to {LOG_FILE_PATH} again")
+            write_failed = False
+        
+        if play_logged:
+            print(f"*** PLAY command logged to {LOG_FILE_PATH} ***")
+
+
+def stop_log_writer():
+    """Let the writer thread drain the queue, then close the log file"""
+    try:
+        log_queue.put(None, timeout=5)
+    except queue.Full:
+        print("Warning: Log writer not draining, some Arduino output was not logged")
+        return
+    log_writer_thread.join(timeout=5)
+    # Closing the fd under a still-running writer could make it write to a reused descriptor
+    if not log_writer_thread.is_alive():
+        os.close(log_fd)
+
+
+log_writer_thread = threading.Thread(target=log_writer, daemon=True)
+log_writer_thread.start()
+atexit.register(stop_log_writer)
+
+# Timestamps have 1 second resolution, so only re-format when the second changes.
+# The cached prefix already holds the encoded "[timestamp] " part of the record.
+last_stamp_sec = 0
+last_stamp_prefix = b""
+
+# Records dropped on a full queue are counted and reported at most once per DROP_REPORT_INTERVAL,
+# so the warnings themselves don't slow down the loop that is already falling behind
+dropped_count = 0
+drop_reported_at = 0.0
+
 try:
     # Set up the serial connection
     ser = serial.Serial(ARDUINO_PORT, BAUD_RATE, timeout=1)
@@ -20,29 +114,50 @@ try:
     time.sleep(2) 
     print(f"Connected! Logging Arduino output to {LOG_FILE_PATH}")
 
+    # Bytes received but not yet terminated by a newline
+    pending = b""
+
     # Infinite loop to keep listening
     while True:
-        # Read a line from the serial port
-        line = ser.readline()
+        # Read everything the serial port has buffered in one call (waits up to the read timeout)
+        pending += ser.read(max(1, ser.in_waiting))
         
-        # If a line was received
-        if line:
-            # Decode bytes to a string and remove whitespace
-            message = line.decode('utf-8').strip()
+        # Process every complete line received so far
+        while (newline := pending.find(b"\n")) != -1:
+            line, pending = pending[:newline + 1], pending[newline + 1:]
+            
+            # Skip blank/keep-alive lines before doing any work on them
+            if line.isspace():
+                continue
+            
+            # Remove whitespace; the message stays as bytes all the way to the log file
+            message_bytes = line.strip()
             
             # Print all messages to console for debugging
-            print(f"Arduino: {message}")
+            if DEBUG:
+                print(f"Arduino: {message_bytes.decode('utf-8')}")
             
             # Log ALL Arduino output with timestamp to make it appear as direct logging
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_entry = f"[{timestamp}] {message}\n"
+            now_sec = int(time.time())
+            if now_sec != last_stamp_sec:
+                last_stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now_sec))
+                last_stamp_prefix = f"[{last_stamp}] ".encode('ascii')
+                last_stamp_sec = now_sec
             
-            with open(LOG_FILE_PATH, 'a') as log_file:
-                log_file.write(log_entry)
+            # Hand the record to the writer thread; drop it rather than block serial reads if the disk can't keep up
+            try:
+                log_queue.put_nowait((last_stamp_prefix, message_bytes, message_bytes == b"PLAY"))
+            except queue.Full:
+                dropped_count += 1
             
-            # Special notification for PLAY commands
-            if message == "PLAY":
-                print(f"*** PLAY command logged to {LOG_FILE_PATH} ***")
+            # Once the interval has passed, the next record reports the drops - whether the
+            # queue is still full or has drained since
+            if dropped_count:
+                now = time.monotonic()
+                if now - drop_reported_at >= DROP_REPORT_INTERVAL:
+                    print(f"Warning: Log queue full, dropped {dropped_count} line(s) of Arduino output")
+                    dropped_count = 0
+                    drop_reported_at = now
 
 except serial.SerialException as e:
     print(f"Error: Could not open port {ARDUINO_PORT}. {e}")
@@ -1,8 +1,26 @@
 #!/usr/bin/env python3
+import os
+import sys
 import time
+import atexit
+import queue
+import signal
 import subprocess
+import threading
 from gpiozero import DistanceSensor
 
+# pigpio timestamps the echo edges in its daemon (µs resolution, no Python polling)
+try:
+    from gpiozero.pins.pigpio import PiGPIOFactory
+except ImportError:
+    PiGPIOFactory = None
+
+# Prefer a persistent paramiko channel; fall back to the ssh command line client
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
 # ====== EDIT THESE ======
 MAC_USER = "orenagiv"
 MAC_HOST = "10.176.46.25"   # or your Mac's IP, e.g., "192.168.1.25"
@@ -18,60 +36,228 @@ HYSTERESIS_CM = 3.0      # must move back past 18 cm to re-arm
 COOLDOWN_SEC = 0.8       # block repeat fires for 0.8s
 SAMPLE_PERIOD = 0.03     # read every 30 ms
 STABLE_COUNT = 3         # require N consecutive readings under/over threshold
+STABLE_MASK = (1 << STABLE_COUNT) - 1  # all of the last N readings agree
 
-sensor = DistanceSensor(echo=ECHO_PIN, trigger=TRIG_PIN, max_distance=2.0)  # meters
+# SSH connection multiplexing: one master connection is kept open so every
+# trigger reuses it instead of paying the full handshake on each wave.
+# The socket lives in the user's own ~/.ssh rather than world-writable /tmp;
+# ssh expands %C to a hash of the connection (user, host, port).
+SSH_DIR = os.path.expanduser("~/.ssh")
+SSH_CONTROL_PATH = os.path.join(SSH_DIR, "ultra_space-%C")
+SSH_CONTROL_PERSIST = "1h"
 
-def send_spacebar():
-    # AppleScript to press Space (key code 49)
-    cmd = [
-        "ssh",
-        f"{MAC_USER}@{MAC_HOST}",
-        'osascript -e \'tell application "System Events" to key code 49\''
-    ]
+# AppleScript to press Space (key code 49)
+SPACEBAR_SCRIPT = 'tell application "System Events" to key code 49'
+
+# After the paramiko channel fails, triggers go through the ssh command line for this long before retrying it
+OSASCRIPT_RETRY_SEC = 60
+
+def create_sensor():
+    """Create the distance sensor, using pigpio edge timing when pigpiod is running"""
+    pin_factory = None
+    if PiGPIOFactory is not None:
+        try:
+            pin_factory = PiGPIOFactory()
+        except Exception as e:
+            print(f"[WARN] pigpio unavailable, using default GPIO timing: {e}")
+    return DistanceSensor(echo=ECHO_PIN, trigger=TRIG_PIN, max_distance=2.0, pin_factory=pin_factory)  # meters
+
+sensor = create_sensor()
+
+def ssh_master_running():
+    """Check whether a master connection is already up (e.g. one left behind by a previous run)"""
+    result = subprocess.run(
+        ["ssh", "-S", SSH_CONTROL_PATH, "-O", "check", f"{MAC_USER}@{MAC_HOST}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+def start_ssh_master():
+    """Open the background SSH master connection that triggers multiplex over"""
     try:
-        subprocess.run(cmd, check=True, timeout=3)
+        if ssh_master_running():
+            return None
+        os.makedirs(SSH_DIR, mode=0o700, exist_ok=True)
+        # ControlMaster=auto (not -M) removes a stale socket from a killed master instead of
+        # falling back to a plain, never-ending "ssh -N" session
+        return subprocess.Popen([
+            "ssh", "-N",
+            "-S", SSH_CONTROL_PATH,
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPersist={SSH_CONTROL_PERSIST}",
+            f"{MAC_USER}@{MAC_HOST}"
+        ])
+    except Exception as e:
+        print(f"[WARN] Failed to start SSH master connection: {e}")
+        return None
+
+def stop_ssh_master():
+    """Ask the SSH master connection to exit"""
+    subprocess.run(
+        ["ssh", "-S", SSH_CONTROL_PATH, "-O", "exit", f"{MAC_USER}@{MAC_HOST}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+# Long-lived channel to an interactive osascript REPL on the Mac (paramiko only)
+_osascript_lock = threading.Lock()
+_osascript_client = None
+_osascript_channel = None
+_osascript_retry_at = 0.0  # monotonic time before which the channel isn't tried again
+
+def open_osascript_channel():
+    """Connect to the Mac and start an osascript REPL that triggers write into"""
+    global _osascript_client, _osascript_channel
+    client = paramiko.SSHClient()
+    client.load_system_host_keys()
+    client.connect(MAC_HOST, username=MAC_USER, timeout=3)
+    channel = client.invoke_shell()
+    channel.send("osascript -i\n")
+    channel.setblocking(False)
+    _osascript_client = client
+    _osascript_channel = channel
+
+def close_osascript_channel():
+    """Close the osascript channel and its SSH connection"""
+    global _osascript_client, _osascript_channel
+    if _osascript_channel is not None:
+        _osascript_channel.close()
+        _osascript_channel = None
+    if _osascript_client is not None:
+        _osascript_client.close()
+        _osascript_client = None
+
+# The ssh fallback command never changes, so build it once.
+# ControlMaster=auto revives the master connection if it has died.
+_SSH_SPACEBAR_CMD = [
+    "ssh",
+    "-S", SSH_CONTROL_PATH,
+    "-o", "ControlMaster=auto",
+    "-o", f"ControlPersist={SSH_CONTROL_PERSIST}",
+    f"{MAC_USER}@{MAC_HOST}",
+    f"osascript -e '{SPACEBAR_SCRIPT}'"
+]
+
+def send_spacebar_ssh():
+    try:
+        # osascript's output isn't used; stderr is kept so ssh errors stay visible
+        subprocess.run(_SSH_SPACEBAR_CMD, check=True, timeout=3, stdout=subprocess.DEVNULL)
     except Exception as e:
         print(f"[WARN] Failed to send spacebar: {e}")
 
-def cm(meters):
-    return meters * 100.0
+def osascript_channel_failed():
+    """Drop the channel and leave the next triggers to the ssh command line for a while"""
+    global _osascript_retry_at
+    close_osascript_channel()
+    _osascript_retry_at = time.monotonic() + OSASCRIPT_RETRY_SEC
+
+def send_spacebar_channel():
+    """Press Space through the osascript channel; returns False if it couldn't be sent"""
+    if time.monotonic() < _osascript_retry_at:
+        return False
+
+    with _osascript_lock:
+        try:
+            if _osascript_channel is None or _osascript_channel.closed:
+                open_osascript_channel()
+            # Drain the REPL's echo so the channel window never fills up
+            while _osascript_channel.recv_ready():
+                _osascript_channel.recv(4096)
+            line = (SPACEBAR_SCRIPT + "\n").encode()
+            sent = _osascript_channel.send(line)
+            if sent == len(line):
+                return True
+            # The channel is non-blocking - a partial line would corrupt the next command, so reconnect
+            print(f"[WARN] Short write to osascript channel ({sent}/{len(line)} bytes), reconnecting")
+            close_osascript_channel()
+        except (paramiko.SSHException, OSError) as e:
+            print(f"[WARN] osascript channel failed, using ssh: {e}")
+            osascript_channel_failed()
+        return False
+
+def send_spacebar():
+    # The ssh command line reads ~/.ssh/config, known_hosts and the agent like an interactive ssh,
+    # so it's the fallback whenever paramiko can't connect or send
+    if paramiko is None or not send_spacebar_channel():
+        send_spacebar_ssh()
+
+# Triggers are sent from a background thread so the sensor loop never blocks on SSH.
+# The single slot coalesces accidental double triggers while a send is in flight.
+_fire_queue = queue.Queue(maxsize=1)
+
+def _fire_worker():
+    while True:
+        _fire_queue.get()
+        send_spacebar()
+
+def fire_spacebar():
+    """Queue a spacebar press without blocking the caller"""
+    try:
+        _fire_queue.put_nowait(None)
+    except queue.Full:
+        pass
+
+def _exit_on_signal(signum, frame):
+    """Turn SIGTERM (kill, systemctl stop) into a normal exit so the atexit cleanup runs"""
+    sys.exit(0)
 
 def main():
-    last_fire = 0.0
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+
+    last_fire = -COOLDOWN_SEC  # allow the very first trigger immediately
     armed = True
-    under_count = 0
-    over_count = 0
+    # Recent readings packed as bits (newest in bit 0): closer than low / farther than high
+    under_mask = 0
+    over_mask = 0
     low = TRIGGER_CM
     high = TRIGGER_CM + HYSTERESIS_CM
 
+    # The ssh master backs the command line path, which every trigger can fall back to
+    start_ssh_master()
+    atexit.register(stop_ssh_master)
+    if paramiko is not None:
+        # Warm up the channel now so the first wave doesn't pay for the connect
+        try:
+            open_osascript_channel()
+        except (paramiko.SSHException, OSError) as e:
+            print(f"[WARN] Failed to open osascript channel, using ssh: {e}")
+            osascript_channel_failed()
+        atexit.register(close_osascript_channel)
+
+    threading.Thread(target=_fire_worker, daemon=True).start()
+
     print(f"Armed. Wave within {TRIGGER_CM} cm to press Space on the Mac.")
+    next_deadline = time.monotonic()
     while True:
-        d = cm(sensor.distance)  # distance in cm
-        now = time.time()
+        d = sensor.distance * 100.0  # distance in cm
+
+        under_mask = ((under_mask << 1) | (d <= low)) & STABLE_MASK
+        over_mask = ((over_mask << 1) | (d >= high)) & STABLE_MASK
 
         if armed:
-            if d <= low:
-                under_count += 1
-                over_count = 0
-                if under_count >= STABLE_COUNT and (now - last_fire) > COOLDOWN_SEC:
+            if under_mask == STABLE_MASK:
+                # Monotonic clock: NTP/clock adjustments can't misfire or block the cooldown
+                now = time.monotonic()
+                if (now - last_fire) > COOLDOWN_SEC:
                     print(f"Trigger: {d:.1f} cm → SPACE")
-                    send_spacebar()
+                    fire_spacebar()
                     last_fire = now
                     armed = False
-                    under_count = 0
-            else:
-                under_count = 0
-        else:
+                    under_mask = 0
+        elif over_mask == STABLE_MASK:
             # Re-arm only after moving away beyond hysteresis distance
-            if d >= high:
-                over_count += 1
-                if over_count >= STABLE_COUNT:
-                    armed = True
-                    over_count = 0
-            else:
-                over_count = 0
-
-        time.sleep(SAMPLE_PERIOD)
+            armed = True
+            over_mask = 0
+
+        # Sleep until the next sample slot so the cadence doesn't drift with loop time
+        next_deadline += SAMPLE_PERIOD
+        delay = next_deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Fell behind (e.g. a slow read) - restart the schedule from now
+            next_deadline = time.monotonic()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,21 +5,88 @@ import os
 import subprocess
 import re
 
+# Matches the output name on each "<output> connected ..." line of xrandr.
+# Output lines start at column 0, so only line starts are tried - the indented mode lines are skipped.
+_CONNECTED_RE = re.compile(r'^(\S+) connected', re.MULTILINE)
 
-def configure_single_display():
+# Matches the resolution on each indented mode line listed under an output
+_MODE_RE = re.compile(r'^\s+(\d+x\d+)\s')
+
+
+def parse_supported_modes(xrandr_output):
+    """Map each connected output to the set of modes xrandr lists for it"""
+    supported_modes = {}
+    current_modes = None
+    for line in xrandr_output.splitlines():
+        if line[:1].isspace():
+            # Mode line belonging to the output above it
+            match = _MODE_RE.match(line)
+            if match and current_modes is not None:
+                current_modes.add(match.group(1))
+        else:
+            # New output (or screen) header line
+            match = _CONNECTED_RE.match(line)
+            current_modes = supported_modes.setdefault(match.group(1), set()) if match else None
+    return supported_modes
+
+
+# Matches the current geometry and rotation on a connected output's line, e.g.
+# "HDMI-1 connected primary 720x1280+0+0 left (normal left inverted right ...) ..."
+_LAYOUT_RE = re.compile(r'^(\S+) connected (?:primary )?(\d+)x(\d+)\+(\d+)\+(\d+) (?:(normal|left|inverted|right) )?\(',
+                        re.MULTILINE)
+
+
+def parse_current_layout(xrandr_output):
+    """Map each active output to its current mode, rotation and x offset"""
+    layout = {}
+    for display, width, height, x, y, rotation in _LAYOUT_RE.findall(xrandr_output):
+        rotation = rotation or 'normal'
+        # xrandr reports the rotated size - swap back to get the mode itself
+        if rotation in ('left', 'right'):
+            width, height = height, width
+        layout[display] = {'mode': f"{width}x{height}", 'rotate': rotation, 'x': int(x)}
+    return layout
+
+
+def _already_configured(current_layout, display, config):
+    """Check whether a display is already running the given mode and rotation"""
+    current = (current_layout or {}).get(display)
+    if current is None:
+        return False
+    if current['mode'] == config['mode'] and current['rotate'] == config['rotate']:
+        return True
+    # Rotated by the firmware at boot (config.txt display_rotate): X sees a native portrait mode
+    # with no rotation of its own, e.g. "720x1280 normal" instead of "1280x720 left"
+    if config['rotate'] in ('left', 'right') and current['rotate'] == 'normal':
+        width, height = config['mode'].split('x')
+        return current['mode'] == f"{height}x{width}"
+    return False
+
+
+def _mode_supported(supported_modes, display, mode):
+    """Check a mode against the parsed xrandr modes (unknown outputs are assumed to support it)"""
+    if not supported_modes or display not in supported_modes:
+        return True
+    return mode in supported_modes[display]
+
+
+def configure_single_display(displays=None, supported_modes=None, current_layout=None):
     """Configure single display resolution for portrait mode videos"""
     try:
         # Set the DISPLAY environment variable
         os.environ['DISPLAY'] = ':0'
         
-        # Get available displays and modes
-        result = subprocess.run(['xrandr'], capture_output=True, text=True, check=True)
-        xrandr_output = result.stdout
-        print("Available displays and modes:")
-        print(xrandr_output)
-        
-        # Find connected displays
-        displays = re.findall(r'(\S+) connected', xrandr_output)
+        if displays is None:
+            # Get available displays and modes
+            result = subprocess.run(['xrandr'], capture_output=True, text=True, check=True)
+            xrandr_output = result.stdout
+            print("Available displays and modes:")
+            print(xrandr_output)
+            
+            # Find connected displays, the modes each one supports and the current layout
+            displays = _CONNECTED_RE.findall(xrandr_output)
+            supported_modes = parse_supported_modes(xrandr_output)
+            current_layout = parse_current_layout(xrandr_output)
         print(f"Found connected displays: {displays}")
         
         if not displays:
@@ -32,14 +99,27 @@ def configure_single_display():
             {'mode': '848x480', 'rotate': 'left'},
         ]
         
+        # Nothing to do if the display was already set up (e.g. from config.txt at boot or a previous run)
+        for display in displays:
+            for config in configs_to_try:
+                if _already_configured(current_layout, display, config):
+                    print(f"{display} already set to {config['mode']} rotated {config['rotate']}, skipping xrandr")
+                    return True
+        
         for display in displays:
             for config in configs_to_try:
+                # Don't spawn xrandr for modes the display doesn't offer
+                if not _mode_supported(supported_modes, display, config['mode']):
+                    print(f"Skipping {config['mode']} on {display}: mode not supported")
+                    continue
+                
                 try:
                     cmd = ['xrandr', '--output', display, '--mode', config['mode']]
                     if config['rotate']:
                         cmd.extend(['--rotate', config['rotate']])
                     
-                    subprocess.run(cmd, check=True)
+                    # Probe output isn't used - don't pipe it through to the console
+                    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                     print(f"Successfully set {display} to {config['mode']} rotated {config['rotate']}")
                     return True  # Success, exit
                     
@@ -58,27 +138,30 @@ def configure_single_display():
         return False
 
 
-def configure_dual_display():
+def configure_dual_display(displays=None, supported_modes=None, current_layout=None):
     """Configure dual display resolution for portrait mode videos on dual screens"""
     try:
         # Set the DISPLAY environment variable
         os.environ['DISPLAY'] = ':0'
         
-        # Get available displays and modes
-        result = subprocess.run(['xrandr'], capture_output=True, text=True, check=True)
-        xrandr_output = result.stdout
-        print("Available displays and modes:")
-        print(xrandr_output)
-        
-        # Find connected displays
-        displays = re.findall(r'(\S+) connected', xrandr_output)
+        if displays is None:
+            # Get available displays and modes
+            result = subprocess.run(['xrandr'], capture_output=True, text=True, check=True)
+            xrandr_output = result.stdout
+            print("Available displays and modes:")
+            print(xrandr_output)
+            
+            # Find connected displays, the modes each one supports and the current layout
+            displays = _CONNECTED_RE.findall(xrandr_output)
+            supported_modes = parse_supported_modes(xrandr_output)
+            current_layout = parse_current_layout(xrandr_output)
         print(f"Found connected displays: {displays}")
         
         if len(displays) < 2:
             print(f"Warning: Found only {len(displays)} display(s), dual screen requires 2")
             if len(displays) == 1:
                 print("Configuring single display in portrait mode...")
-                return configure_single_display()
+                return configure_single_display(displays, supported_modes, current_layout)
             print("No displays found")
             return False
         
@@ -94,14 +177,30 @@ def configure_dual_display():
         display1 = displays[0]
         display2 = displays[1]
         
+        # Nothing to do if both displays were already set up side by side (e.g. from config.txt or a previous run)
         for config in configs_to_try:
+            if (_already_configured(current_layout, display1, config) and
+                    _already_configured(current_layout, display2, config) and
+                    current_layout[display2]['x'] > current_layout[display1]['x']):
+                print(f"Displays {display1} and {display2} already set to {config['mode']} rotated {config['rotate']}, skipping xrandr")
+                return True
+        
+        for config in configs_to_try:
+            # Don't spawn xrandr for modes either display doesn't offer
+            if not (_mode_supported(supported_modes, display1, config['mode']) and
+                    _mode_supported(supported_modes, display2, config['mode'])):
+                print(f"Skipping {config['mode']}: mode not supported by both displays")
+                continue
+            
             try:
-                # Configure first screen (left) for left video - portrait mode
-                subprocess.run(['xrandr', '--output', display1, '--mode', config['mode'], '--rotate', config['rotate']], check=True)
+                # Configure both screens in a single xrandr call so the mode switch is applied at once:
+                # first screen (left) for left video, second screen (right) for right video positioned to the right
+                subprocess.run([
+                    'xrandr',
+                    '--output', display1, '--mode', config['mode'], '--rotate', config['rotate'],
+                    '--output', display2, '--mode', config['mode'], '--rotate', config['rotate'], '--right-of', display1
+                ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 print(f"Left display ({display1}) set to {config['mode']} rotated {config['rotate']}")
-                
-                # Configure second screen (right) for right video - portrait mode, positioned to the right
-                subprocess.run(['xrandr', '--output', display2, '--mode', config['mode'], '--rotate', config['rotate'], '--right-of', display1], check=True)
                 print(f"Right display ({display2}) set to {config['mode']} rotated {config['rotate']} and positioned to the right")
                 
                 return True  # Success, exit
@@ -113,11 +212,16 @@ def configure_dual_display():
         print("Warning: Could not configure dual displays with any supported mode")
         print("Attempting fallback configuration...")
         try:
-            # Fallback: try individual configuration without positioning
-            subprocess.run(['xrandr', '--output', display1, '--mode', '1280x720', '--rotate', 'left'], check=False)
-            subprocess.run(['xrandr', '--output', display2, '--mode', '1280x720', '--rotate', 'left'], check=False)
-            print("Fallback dual display configuration attempted")
-            return True
+            # Fallback: try individual configuration without positioning. Kept as one xrandr call per
+            # output - xrandr aborts the whole command if one output lacks the mode, which would leave
+            # the other screen unconfigured too.
+            configured = []
+            for display in (display1, display2):
+                result = subprocess.run(['xrandr', '--output', display, '--mode', '1280x720', '--rotate', 'left'], check=False)
+                if result.returncode == 0:
+                    configured.append(display)
+            print(f"Fallback dual display configuration attempted, configured: {configured or 'none'}")
+            return bool(configured)
         except Exception as e2:
             print(f"Fallback configuration also failed: {e2}")
             return False
@@ -141,10 +245,12 @@ def get_display_info():
         xrandr_output = result.stdout
         
         # Find connected displays
-        displays = re.findall(r'(\S+) connected', xrandr_output)
+        displays = _CONNECTED_RE.findall(xrandr_output)
         
         return {
             'displays': displays,
+            'supported_modes': parse_supported_modes(xrandr_output),
+            'current_layout': parse_current_layout(xrandr_output),
             'xrandr_output': xrandr_output,
             'display_count': len(displays)
         }
@@ -153,6 +259,8 @@ def get_display_info():
         print(f"Warning: Could not run xrandr: {e}")
         return {
             'displays': [],
+            'supported_modes': {},
+            'current_layout': {},
             'xrandr_output': '',
             'display_count': 0
         }
@@ -160,6 +268,8 @@ def get_display_info():
         print(f"Warning: Unexpected error getting display info: {e}")
         return {
             'displays': [],
+            'supported_modes': {},
+            'current_layout': {},
             'xrandr_output': '',
             'display_count': 0
         }
@@ -177,7 +287,11 @@ def configure_display(mode='auto'):
     Returns:
         bool: True if configuration was successful, False otherwise
     """
+    # Run xrandr once and hand the parsed displays, modes and current layout to the configurators
     display_info = get_display_info()
+    displays = display_info['displays']
+    supported_modes = display_info['supported_modes']
+    current_layout = display_info['current_layout']
     display_count = display_info['display_count']
     
     print(f"Display configuration mode: {mode}")
@@ -186,19 +300,19 @@ def configure_display(mode='auto'):
     if mode == 'auto':
         if display_count >= 2:
             print("Auto mode: Configuring dual displays")
-            return configure_dual_display()
+            return configure_dual_display(displays, supported_modes, current_layout)
         elif display_count == 1:
             print("Auto mode: Configuring single display")
-            return configure_single_display()
+            return configure_single_display(displays, supported_modes, current_layout)
         else:
             print("Auto mode: No displays found")
             return False
     elif mode == 'single':
         print("Single mode: Configuring single display")
-        return configure_single_display()
+        return configure_single_display(displays, supported_modes, current_layout)
     elif mode == 'dual':
         print("Dual mode: Configuring dual displays")
-        return configure_dual_display()
+        return configure_dual_display(displays, supported_modes, current_layout)
     else:
         print(f"Unknown mode: {mode}. Use 'auto', 'single', or 'dual'")
         return False
\ No newline at end of file
@@ -0,0 +1,49 @@
+# PIR motion sensor setup shared by the Raspberry Pi video players
+
+# gpiozero with fallback for non-RPi systems
+try:
+    from gpiozero import DigitalInputDevice
+except Exception:
+    DigitalInputDevice = None
+
+# With pigpio the edge detection runs in the pigpiod daemon, which queues each PIR edge for the
+# callback - a busy player process (e.g. VLC starting up) delays the trigger rather than missing it
+try:
+    from gpiozero.pins.pigpio import PiGPIOFactory
+except Exception:
+    PiGPIOFactory = None
+
+# Seconds; shorter glitches on the PIR line are ignored. Kept small (pigpio accepts at most 0.3 s):
+# repeat triggers are handled by each player's cooldown in its main loop, not by the debounce.
+PIR_BOUNCE_TIME = 0.05
+
+
+class _DummyMotionSensor:
+    """Allow running/testing on non-RPi systems by providing a dummy motion sensor"""
+    # Never reports motion by default. Call when_activated() manually to simulate motion.
+    is_active = False
+    when_activated = None
+
+    def __init__(self, pin, **kwargs):
+        print(f"DummyMotionSensor: pin={pin}, {kwargs}")
+
+    def close(self):
+        print("DummyMotionSensor: close()")
+
+
+def create_motion_sensor(pin):
+    """Create the PIR sensor as an edge-triggered input: gpiozero calls when_activated
+    from the pin factory's edge callback on each rising edge, no sampling thread involved"""
+    sensor_args = {'bounce_time': PIR_BOUNCE_TIME}
+    if DigitalInputDevice is not None:
+        pin_factory = None
+        if PiGPIOFactory is not None:
+            try:
+                pin_factory = PiGPIOFactory()
+            except Exception as e:
+                print(f"Warning: pigpio unavailable, using default GPIO pin factory: {e}")
+        try:
+            return DigitalInputDevice(pin, pin_factory=pin_factory, **sensor_args)
+        except Exception as e:
+            print(f"Warning: Could not set up motion sensor, using dummy sensor: {e}")
+    return _DummyMotionSensor(pin, **sensor_args)
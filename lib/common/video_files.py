@@ -0,0 +1,13 @@
+# Video file helpers shared by the Raspberry Pi video players
+
+import os
+
+# Existence of every video path checked so far - each file is stat'ed only once per run
+VIDEO_EXISTS = {}
+
+
+def video_exists(path):
+    """Look up a video in the cached stat results, only stat-ing paths that weren't checked yet"""
+    if path not in VIDEO_EXISTS:
+        VIDEO_EXISTS[path] = os.path.isfile(path)
+    return VIDEO_EXISTS[path]
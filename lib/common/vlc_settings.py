@@ -0,0 +1,7 @@
+# libvlc settings shared by the Raspberry Pi video players
+
+# Let libvlc's avcodec decoder use whichever hardware decoder the Pi offers (DRM/V4L2 on Bookworm),
+# falling back to software decoding. Only the decoding is offloaded: the picture still goes through
+# VLC's regular X11 video output, so the xrandr portrait rotation and our window placement apply.
+# (MMAL's own video output would draw on a firmware layer outside X and bypass both.)
+VLC_HW_DECODE_ARGS = ['--avcodec-hw=any']
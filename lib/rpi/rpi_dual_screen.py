@@ -1,6 +1,6 @@
 # The following script will load dual videos (left and right screens) and pause on the first frame.
 # This script is a python script that will run on Raspberry Pi.
-# We will use a motion detection sensor "GPIO" connected to pin 14.
+# We will use a motion detection sensor (PIR, via gpiozero) connected to GPIO pin 14.
 # When the sensor detects motion closer than one meter of range - then play the videos.
 # When the videos end go back to the first frame of the videos.
 # The script rotates between 3 sets of dual videos: dual_video_1, dual_video_2, dual_video_3
@@ -12,56 +12,106 @@
 # Standard library imports
 import time
 import os
+import glob
+import logging
+import selectors
 import subprocess
 import signal
 import sys
+import threading
 
 # Third-party imports
 import vlc
 
-# Add the parent directory to the path so we can import from lib
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 # Local imports
-from common.configure_displays import configure_display
+if __package__:
+    # Run as a module (python -m lib.rpi.<script>) - regular package import
+    from ..common.configure_displays import configure_display
+    from ..common.video_files import video_exists
+    from ..common.motion_sensor import create_motion_sensor
+    from ..common.vlc_settings import VLC_HW_DECODE_ARGS
+else:
+    # Run as a script - add the parent directory to the path so we can import from lib
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common.configure_displays import configure_display
+    from common.video_files import video_exists
+    from common.motion_sensor import create_motion_sensor
+    from common.vlc_settings import VLC_HW_DECODE_ARGS
 
-# GPIO setup with fallback for non-RPi systems
+# python-xlib lets us create the video windows ourselves; without it fall back to xdotool/wmctrl
 try:
-    import RPi.GPIO as GPIO
-except Exception:
-    # Allow running/testing on non-RPi systems by providing a dummy GPIO
-    class _DummyGPIO:
-        BCM = 'BCM'
-        IN = 'IN'
+    from Xlib import X
+    from Xlib import display as xdisplay
+except ImportError:
+    xdisplay = None
 
-        def setmode(self, mode):
-            print(f"DummyGPIO: setmode({mode})")
+# Logging: DUALVIDEO_LOG picks the level (e.g. DEBUG for the full trace, WARNING to keep the journal quiet)
+LOG_LEVEL = os.environ.get("DUALVIDEO_LOG", "INFO").upper()
+# basicConfig() raises on an unknown level name - a typo in the service file must not stop the player
+LOG_LEVEL_VALID = isinstance(logging.getLevelName(LOG_LEVEL), int)
+logging.basicConfig(level=LOG_LEVEL if LOG_LEVEL_VALID else logging.INFO,
+                    format='%(asctime)s %(levelname)s %(message)s')
+log = logging.getLogger('dualvideo')
+if not LOG_LEVEL_VALID:
+    log.warning("Unknown DUALVIDEO_LOG level %r, using INFO", LOG_LEVEL)
 
-        def setup(self, pin, mode):
-            print(f"DummyGPIO: setup(pin={pin}, mode={mode})")
+# Global flag for graceful shutdown
+shutdown_requested = False
 
-        def input(self, pin):
-            # Always return 0 (no motion) by default. You can change to 1 for testing.
-            return 0
+# Self-pipe that wakes up the main thread: the motion sensor and libvlc end-of-playback callbacks
+# write to it, and so does Python's C-level signal handler once main() installs it with signal.set_wakeup_fd()
+wake_read_fd, wake_write_fd = os.pipe()
+os.set_blocking(wake_read_fd, False)
+os.set_blocking(wake_write_fd, False)
+wake_selector = selectors.DefaultSelector()
+wake_selector.register(wake_read_fd, selectors.EVENT_READ)
 
-        def cleanup(self):
-            print("DummyGPIO: cleanup()")
+MOTION_WAKEUP = b'm'    # written by the motion sensor callback
+PLAYBACK_WAKEUP = b'p'  # written by the libvlc end/error/stopped callbacks
 
-    GPIO = _DummyGPIO()
+def wake_up(reason):
+    """Wake up the main thread (called from the motion sensor and libvlc callback threads)"""
+    try:
+        os.write(wake_write_fd, reason)
+    except BlockingIOError:
+        pass  # Pipe already full of wake-ups - the main thread will wake anyway
 
-# Global flag for graceful shutdown
-shutdown_requested = False
+def drain_wakeups():
+    """Read and return the pending wake-ups (motion, playback and signal bytes) from the self-pipe"""
+    wakeups = b""
+    try:
+        while chunk := os.read(wake_read_fd, 4096):
+            wakeups += chunk
+    except BlockingIOError:
+        pass
+    return wakeups
 
 def signal_handler(signum, frame):
     """Handle termination signals gracefully"""
+    # Only set the flag: the handler runs between bytecodes of the main thread, so taking a lock here
+    # (logging, threading.Event.set()) could deadlock against the code it interrupted.
+    # The main thread is woken through the set_wakeup_fd pipe, both when idle and during playback.
     global shutdown_requested
-    print(f"\nReceived signal {signum}. Shutting down gracefully...")
     shutdown_requested = True
 
-# GPIO setup
+# Motion sensor setup
 PIR_PIN = 14  # GPIO pin for PIR motion sensor
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(PIR_PIN, GPIO.IN)
+COOLDOWN_PERIOD = 3  # Seconds to wait before allowing another trigger
+STATUS_INTERVAL = 10  # Seconds between status outputs while idle
+
+# Size of each (portrait) screen; the right screen starts where the left one ends
+SCREEN_WIDTH = 720
+SCREEN_HEIGHT = 1280
+
+FIRST_FRAME_TIMEOUT = 2.0  # Seconds to wait for each player to start when loading the first frame
+
+# Production tuning (PRODUCTION=1): keep the CPU at full clock and give the trigger path real-time priority.
+# Needs root (governor) / CAP_SYS_NICE (SCHED_FIFO); failures are only logged.
+PRODUCTION = os.environ.get("PRODUCTION") == "1"
+CPU_GOVERNOR_PATHS = "/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor"
+SCHED_FIFO_PRIORITY = 10
+
+pir = create_motion_sensor(PIR_PIN)
 
 # Video configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -84,139 +134,207 @@ VIDEO_SETS = [
     # }
 ]
 
-# Debug: Print the video paths to verify they're correct
-print(f"Script directory: {SCRIPT_DIR}")
+# Resolve the "../.." parts once so VLC and the checks below all see the same absolute path
+VIDEO_SETS = [{side: os.path.abspath(path) for side, path in video_set.items()} for video_set in VIDEO_SETS]
+
+# Debug: Print the video paths to verify they're correct (the stat results are reused by _check_videos)
+log.debug("Script directory: %s", SCRIPT_DIR)
 for i, video_set in enumerate(VIDEO_SETS):
-    print(f"Video set {i+1} left path: {video_set['left']}")
-    print(f"Video set {i+1} left exists: {os.path.exists(video_set['left'])}")
-    print(f"Video set {i+1} right path: {video_set['right']}")
-    print(f"Video set {i+1} right exists: {os.path.exists(video_set['right'])}")
+    log.debug("Video set %s left path: %s", i+1, video_set['left'])
+    log.debug("Video set %s left exists: %s", i+1, video_exists(video_set['left']))
+    log.debug("Video set %s right path: %s", i+1, video_set['right'])
+    log.debug("Video set %s right exists: %s", i+1, video_exists(video_set['right']))
 
 class DualVideoPlayer:
     def __init__(self, video_sets):
-        print("Initializing DualVideoPlayer...")
+        log.debug("Initializing DualVideoPlayer...")
         self.video_sets = video_sets
         self.current_set_index = 0
         self.is_playing = False
-        self.vlc_instance_left = None
-        self.vlc_instance_right = None
+        self.vlc_instance = None
         self.vlc_player_left = None
         self.vlc_player_right = None
+        self.media_cache = []  # (left, right) media per video set, parsed once
+        self.x_display = None
+        self.video_windows = []  # X windows the players render into (empty when python-xlib is missing)
+        # Set from libvlc's event thread when each player reaches the end (or fails)
+        self.left_done = threading.Event()
+        self.right_done = threading.Event()
+        # Set from libvlc's event thread once each player has actually started playing
+        self.left_playing = threading.Event()
+        self.right_playing = threading.Event()
+        # Set from libvlc's event thread once each player has a video output (i.e. a picture can be shown)
+        self.left_vout = threading.Event()
+        self.right_vout = threading.Event()
         
         # Check if video files exist
-        print("Checking video files...")
+        log.debug("Checking video files...")
         self.initialized = self._check_videos()
         if self.initialized:
-            print("Videos found, starting VLC instances...")
+            log.debug("Videos found, starting VLC instances...")
             vlc_started = self._start_vlc_instances()
             if not vlc_started:
-                print("Failed to start VLC instances, marking as not initialized")
+                log.warning("Failed to start VLC instances, marking as not initialized")
                 self.initialized = False
         else:
-            print("Video check failed")
+            log.warning("Video check failed")
         
     def _check_videos(self):
         """Check if all video files exist"""
         for i, video_set in enumerate(self.video_sets):
-            if not os.path.exists(video_set['left']):
-                print(f"Error: Left video file not found at {video_set['left']}")
+            if not video_exists(video_set['left']):
+                log.error("Left video file not found at %s", video_set['left'])
                 return False
-            if not os.path.exists(video_set['right']):
-                print(f"Error: Right video file not found at {video_set['right']}")
+            if not video_exists(video_set['right']):
+                log.error("Right video file not found at %s", video_set['right'])
                 return False
-            print(f"Video set {i + 1} found: left={video_set['left']}, right={video_set['right']}")
+            log.debug("Video set %s found: left=%s, right=%s", i + 1, video_set['left'], video_set['right'])
         return True
     
     def _start_vlc_instances(self):
         """Start VLC instances for both left and right screens using python-vlc"""
         try:
-            # Check if VLC is available
-            try:
-                vlc.Instance()
-                print("VLC is available")
-            except Exception as e:
-                print(f"VLC is not available or not installed: {e}")
-                return False
-            
-            # Create VLC instance for left screen - windowed mode first, then position
-            self.vlc_instance_left = vlc.Instance([
+            # Create a single VLC instance shared by both screens - windowed mode first, then position.
+            # libvlc supports several media players per instance, so the core, plugin cache and
+            # worker threads are only set up once.
+            self.vlc_instance = vlc.Instance([
                 '--intf', 'dummy',  # No interface
                 '--no-video-title-show',  # Don't show video title
                 '--no-osd',         # No on-screen display
-                '--video-on-top',   # Ensure video stays on top
-                '--no-video-deco',  # No window decorations
-                '--no-embedded-video',  # Don't embed video in interface
-                '--no-qt-privacy-ask',  # Don't ask for privacy settings
+                '--no-video-deco',  # No window decorations (only matters for VLC's own windows)
                 '--aout', 'alsa',   # Use ALSA audio output (common on Raspberry Pi)
                 # '--no-audio',
-                '--quiet'           # Reduce console output
+                '--file-caching=300',  # Local files need little read-ahead; start both screens sooner
+                '--quiet',          # Reduce console output
+                *VLC_HW_DECODE_ARGS
             ])
+            if self.vlc_instance is None:
+                # python-vlc returns None when libvlc fails to initialize
+                log.error("VLC not available. Please install VLC and python-vlc (pip install python-vlc).")
+                return False
             
-            # Create VLC instance for right screen - windowed mode first, then position
-            self.vlc_instance_right = vlc.Instance([
-                '--intf', 'dummy',  # No interface
-                '--no-video-title-show',  # Don't show video title
-                '--no-osd',         # No on-screen display
-                '--video-on-top',   # Ensure video stays on top
-                '--no-video-deco',  # No window decorations
-                '--no-embedded-video',  # Don't embed video in interface
-                '--no-qt-privacy-ask',  # Don't ask for privacy settings
-                '--aout', 'alsa',   # Use ALSA audio output (common on Raspberry Pi)
-                # '--no-audio',
-                '--quiet'           # Reduce console output
-            ])
+            # Create one media player per screen
+            self.vlc_player_left = self.vlc_instance.media_player_new()
+            self.vlc_player_right = self.vlc_instance.media_player_new()
+            
+            # Get notified by libvlc when playback ends instead of polling the player state
+            for player, done in ((self.vlc_player_left, self.left_done), (self.vlc_player_right, self.right_done)):
+                event_manager = player.event_manager()
+                for event_type in (vlc.EventType.MediaPlayerEndReached,
+                                   vlc.EventType.MediaPlayerEncounteredError,
+                                   vlc.EventType.MediaPlayerStopped):
+                    event_manager.event_attach(event_type, lambda event, done=done: self._on_playback_end(done))
+            for player, playing, vout_ready in ((self.vlc_player_left, self.left_playing, self.left_vout),
+                                                (self.vlc_player_right, self.right_playing, self.right_vout)):
+                event_manager = player.event_manager()
+                event_manager.event_attach(vlc.EventType.MediaPlayerPlaying,
+                                           lambda event, playing=playing: playing.set())
+                event_manager.event_attach(vlc.EventType.MediaPlayerVout,
+                                           lambda event, vout_ready=vout_ready: vout_ready.set())
             
-            # Create media players
-            self.vlc_player_left = self.vlc_instance_left.media_player_new()
-            self.vlc_player_right = self.vlc_instance_right.media_player_new()
+            # Render into our own windows, already placed on each screen, when python-xlib is available
+            if self._create_video_windows():
+                self.vlc_player_left.set_xwindow(self.video_windows[0].id)
+                self.vlc_player_right.set_xwindow(self.video_windows[1].id)
+                log.debug("VLC players attached to the left and right screen windows")
+            
+            # Open every video once up front; playback just swaps the cached media in.
+            # Only the first set is parsed now - each following set is parsed while the one before it plays.
+            for video_set in self.video_sets:
+                media_left = self.vlc_instance.media_new(video_set['left'])
+                media_right = self.vlc_instance.media_new(video_set['right'])
+                self.media_cache.append((media_left, media_right))
+            self._prefetch_set(self.current_set_index)
+            log.debug("Cached media for %s video set(s)", len(self.media_cache))
             
             # Don't set fullscreen immediately - we'll position windows first when playing
 
             # Set volume to 100% for left player (audio), 0% for right player (no audio to avoid duplicate)
             self.vlc_player_left.audio_set_volume(100)
             self.vlc_player_right.audio_set_volume(100)  # Mute right player to avoid audio overlap
-            print("VLC instances created: Left with audio (100%), Right muted")
-            print("Window positioning will be handled when videos are played")
+            log.debug("VLC media players created: Left with audio (100%), Right muted")
+            log.debug("Window positioning will be handled when videos are played")
             
-            print("VLC instances and players created successfully")
+            log.debug("VLC instance and players created successfully")
             return True
             
         except Exception as e:
-            print(f"Error starting VLC instances: {e}")
+            log.error("Error starting VLC instances: %s", e)
             return False
     
+    def _prefetch_set(self, index):
+        """Start parsing a video set's media in the background (libvlc parses asynchronously)"""
+        for media in self.media_cache[index]:
+            if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+                media.parse_with_options(vlc.MediaParseFlag.local, 0)
+    
+    def _create_video_windows(self):
+        """Create a borderless window covering each screen for the players to render into"""
+        if xdisplay is None:
+            log.debug("python-xlib not available, windows will be positioned with xdotool/wmctrl")
+            return False
+        
+        try:
+            self.x_display = xdisplay.Display()
+            screen = self.x_display.screen()
+            for x in (0, SCREEN_WIDTH):
+                window = screen.root.create_window(
+                    x, 0, SCREEN_WIDTH, SCREEN_HEIGHT, 0, screen.root_depth,
+                    background_pixel=screen.black_pixel,
+                    override_redirect=True,  # Keep the window manager from moving or decorating it
+                )
+                window.map()
+                self.video_windows.append(window)
+            self.x_display.flush()
+            log.debug("Created video windows at (0,0) and (%s,0)", SCREEN_WIDTH)
+            return True
+        except Exception as e:
+            log.warning("Could not create video windows, falling back to window positioning: %s", e)
+            self._destroy_video_windows()
+            return False
+    
+    def _destroy_video_windows(self):
+        """Destroy the video windows and close the X connection"""
+        if self.x_display is None:
+            return
+        try:
+            for window in self.video_windows:
+                window.destroy()
+            self.x_display.close()
+        except Exception as e:
+            log.error("Error during video window cleanup: %s", e)
+        finally:
+            self.video_windows = []
+            self.x_display = None
+    
     def _position_and_fullscreen_videos(self):
         """Position video windows on correct displays and set fullscreen"""
         try:
-            print("Positioning video windows on dual screens...")
+            log.debug("Positioning video windows on dual screens...")
             
             # Wait a moment for windows to appear
             time.sleep(1.0)
             
-            # Method 1: Try using xdotool to position windows
+            # Method 1: Try using xdotool to position windows.
+            # Search and both moves are chained into one xdotool run (one process, one X connection):
+            # %1/%2 are the first and second VLC windows found by the search.
             try:
-                # Get all VLC windows
-                result = subprocess.run(['xdotool', 'search', '--class', 'vlc'], 
-                                      capture_output=True, text=True, check=True)
-                window_ids = result.stdout.strip().split('\n')
+                subprocess.run([
+                    'xdotool', 'search', '--class', 'vlc',
+                    'windowmove', '%1', '0', '0',                   # First VLC window to left screen (0,0)
+                    'windowmove', '%2', str(SCREEN_WIDTH), '0'      # Second VLC window to right screen (720,0)
+                ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                log.debug("Positioned windows using xdotool: left at (0,0), right at (%s,0)", SCREEN_WIDTH)
                 
-                if len(window_ids) >= 2:
-                    # Move first VLC window to left screen (0,0)
-                    subprocess.run(['xdotool', 'windowmove', window_ids[0], '0', '0'], check=True)
-                    # Move second VLC window to right screen (720,0) 
-                    subprocess.run(['xdotool', 'windowmove', window_ids[1], '720', '0'], check=True)
-                    print(f"Positioned windows using xdotool: left at (0,0), right at (720,0)")
-                    
-                    # Now set both to fullscreen
-                    self.vlc_player_left.set_fullscreen(True)
-                    self.vlc_player_right.set_fullscreen(True)
-                    print("Set both videos to fullscreen")
-                    return True
-                else:
-                    print(f"Found {len(window_ids)} VLC windows, expected 2")
+                # Now set both to fullscreen
+                self.vlc_player_left.set_fullscreen(True)
+                self.vlc_player_right.set_fullscreen(True)
+                log.debug("Set both videos to fullscreen")
+                return True
                     
             except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                print(f"xdotool positioning failed: {e}")
+                # Also ends up here when fewer than 2 VLC windows were found
+                log.warning("xdotool positioning failed: %s", e)
                 
             # Method 2: Fallback - try using wmctrl if available
             try:
@@ -232,7 +350,7 @@ class DualVideoPlayer:
                     # Move windows to different screens
                     subprocess.run(['wmctrl', '-i', '-r', window_id_1, '-e', '0,0,0,720,1280'], check=True)
                     subprocess.run(['wmctrl', '-i', '-r', window_id_2, '-e', '0,720,0,720,1280'], check=True)
-                    print("Positioned windows using wmctrl")
+                    log.debug("Positioned windows using wmctrl")
                     
                     # Set fullscreen
                     self.vlc_player_left.set_fullscreen(True)
@@ -240,16 +358,16 @@ class DualVideoPlayer:
                     return True
                     
             except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                print(f"wmctrl positioning failed: {e}")
+                log.warning("wmctrl positioning failed: %s", e)
             
             # Method 3: Fallback - just set fullscreen and hope for the best
-            print("Window positioning tools not available, setting fullscreen directly")
+            log.warning("Window positioning tools not available, setting fullscreen directly")
             self.vlc_player_left.set_fullscreen(True)
             self.vlc_player_right.set_fullscreen(True)
             return True
                     
         except Exception as e:
-            print(f"Error in positioning videos: {e}")
+            log.error("Error in positioning videos: %s", e)
             # Still try to set fullscreen as fallback
             try:
                 self.vlc_player_left.set_fullscreen(True)
@@ -263,43 +381,66 @@ class DualVideoPlayer:
         try:
             self._position_and_fullscreen_videos()
         except Exception as e:
-            print(f"Error setting fullscreen: {e}")
+            log.error("Error setting fullscreen: %s", e)
     
-    def show_first_frame(self):
-        """Show the first frame of current video set and pause"""
-        if not self.initialized:
-            return False
-            
-        current_set = self.video_sets[self.current_set_index]
-        print(f"Showing first frame of video set {self.current_set_index + 1}")
+    def _load_and_play(self, pause_after=False):
+        """Load the current video set into both players and start them, optionally pausing on the first frame"""
+        # Use the media cached for the current video set
+        media_left, media_right = self.media_cache[self.current_set_index]
         
-        try:
-            # Create media for current video set
-            media_left = self.vlc_instance_left.media_new(current_set['left'])
-            media_right = self.vlc_instance_right.media_new(current_set['right'])
-            
-            self.vlc_player_left.set_media(media_left)
-            self.vlc_player_right.set_media(media_right)
-            
-            # Start playing to load the first frame
-            self.vlc_player_left.play()
-            self.vlc_player_right.play()
-
-            # Position windows and set fullscreen
+        self.vlc_player_left.set_media(media_left)
+        self.vlc_player_right.set_media(media_right)
+        
+        # Start playing both videos simultaneously
+        self.left_playing.clear()
+        self.right_playing.clear()
+        self.left_vout.clear()
+        self.right_vout.clear()
+        self.left_done.clear()
+        self.right_done.clear()
+        self.vlc_player_left.play()
+        self.vlc_player_right.play()
+        
+        # Position windows and set fullscreen (our own windows are already in place)
+        if not self.video_windows:
             self._position_and_fullscreen_videos()
-
-            # Wait a moment for the videos to start and positioning to take effect
-            time.sleep(0.5)
+        
+        if pause_after:
+            # Wait until both players are really playing (returns as soon as decoding starts)
+            if not (self.left_playing.wait(timeout=FIRST_FRAME_TIMEOUT) and
+                    self.right_playing.wait(timeout=FIRST_FRAME_TIMEOUT)):
+                log.warning("Videos did not start within %s seconds", FIRST_FRAME_TIMEOUT)
+                # Don't leave a late starter running - the idle screen would play the whole clip
+                self.vlc_player_left.stop()
+                self.vlc_player_right.stop()
+                return False
+            
+            # Don't pause before there is a picture on screen. libvlc keeps the video output across
+            # media of the same format, in which case has_vout() is already set and no event comes.
+            for player, vout_ready in ((self.vlc_player_left, self.left_vout), (self.vlc_player_right, self.right_vout)):
+                if not player.has_vout() and not vout_ready.wait(timeout=FIRST_FRAME_TIMEOUT):
+                    log.warning("No video output after %s seconds, pausing anyway", FIRST_FRAME_TIMEOUT)
             
             # Pause to show only the first frame
             self.vlc_player_left.pause()
             self.vlc_player_right.pause()
+        return True
+    
+    def show_first_frame(self):
+        """Show the first frame of current video set and pause"""
+        if not self.initialized:
+            return False
             
-            print(f"First frames displayed for video set {self.current_set_index + 1}")
+        log.debug("Showing first frame of video set %s", self.current_set_index + 1)
+        
+        try:
+            if not self._load_and_play(pause_after=True):
+                return False
+            log.debug("First frames displayed for video set %s", self.current_set_index + 1)
             return True
             
         except Exception as e:
-            print(f"Error showing first frame: {e}")
+            log.error("Error showing first frame: %s", e)
             return False
     
     def play_video(self):
@@ -311,61 +452,50 @@ class DualVideoPlayer:
             return
             
         current_set = self.video_sets[self.current_set_index]
-        print(f"Playing video set {self.current_set_index + 1}: left={current_set['left']}, right={current_set['right']}")
+        log.info("Playing video set %s: left=%s, right=%s", self.current_set_index + 1, current_set['left'], current_set['right'])
         
         self.is_playing = True
         
         try:
-            # Create media for current video set
-            media_left = self.vlc_instance_left.media_new(current_set['left'])
-            media_right = self.vlc_instance_right.media_new(current_set['right'])
-            
-            self.vlc_player_left.set_media(media_left)
-            self.vlc_player_right.set_media(media_right)
+            self._load_and_play()
             
-            # Start playing both videos simultaneously
-            self.vlc_player_left.play()
-            self.vlc_player_right.play()
-            
-            # Position windows and set fullscreen for playback
-            self._position_and_fullscreen_videos()
+            # Parse the next video set while this one plays so it's ready to show right after
+            self._prefetch_set((self.current_set_index + 1) % len(self.media_cache))
             
             # Wait for videos to finish playing
             self._wait_for_videos_end()
             
-            print(f"Video set {self.current_set_index + 1} finished playing")
+            log.info("Video set %s finished playing", self.current_set_index + 1)
             
         except Exception as e:
-            print(f"Error playing videos: {e}")
+            log.error("Error playing videos: %s", e)
         finally:
             self.is_playing = False
             # Move to next video set
             self._rotate_to_next_set()
     
+    def _on_playback_end(self, done):
+        """libvlc callback: mark the player as done and wake up the playback wait"""
+        done.set()
+        wake_up(PLAYBACK_WAKEUP)
+    
     def _wait_for_videos_end(self):
         """Wait for both videos to finish playing"""
-        print("Waiting for videos to finish...")
-        
-        # Wait for the videos to start
-        time.sleep(1)
+        log.debug("Waiting for videos to finish...")
         
-        while not shutdown_requested and self.is_playing:
-            state_left = self.vlc_player_left.get_state()
-            state_right = self.vlc_player_right.get_state()
-            
-            # Check if both videos have ended
-            if (state_left == vlc.State.Ended or state_left == vlc.State.Error or state_left == vlc.State.Stopped) and \
-               (state_right == vlc.State.Ended or state_right == vlc.State.Error or state_right == vlc.State.Stopped):
-                print("Both videos finished")
-                break
-                
-            # Check every 0.1 seconds
-            time.sleep(0.1)
+        # Sleep on the self-pipe: the end callbacks and shutdown signals both write to it
+        while not (self.left_done.is_set() and self.right_done.is_set()):
+            if shutdown_requested:
+                log.debug("Playback interrupted by shutdown")
+                return
+            wake_selector.select()
+            drain_wakeups()  # motion during playback is ignored
+        log.debug("Both videos finished")
     
     def _rotate_to_next_set(self):
         """Move to the next video set in the sequence"""
         self.current_set_index = (self.current_set_index + 1) % len(self.video_sets)
-        print(f"Rotated to video set {self.current_set_index + 1}")
+        log.debug("Rotated to video set %s", self.current_set_index + 1)
     
     def cleanup(self):
         """Clean up resources"""
@@ -375,9 +505,9 @@ class DualVideoPlayer:
             try:
                 self.vlc_player_left.stop()
                 self.vlc_player_left.release()
-                print("Left VLC player stopped and released")
+                log.debug("Left VLC player stopped and released")
             except Exception as e:
-                print(f"Error during left VLC player cleanup: {e}")
+                log.error("Error during left VLC player cleanup: %s", e)
             finally:
                 self.vlc_player_left = None
         
@@ -385,33 +515,76 @@ class DualVideoPlayer:
             try:
                 self.vlc_player_right.stop()
                 self.vlc_player_right.release()
-                print("Right VLC player stopped and released")
+                log.debug("Right VLC player stopped and released")
             except Exception as e:
-                print(f"Error during right VLC player cleanup: {e}")
+                log.error("Error during right VLC player cleanup: %s", e)
             finally:
                 self.vlc_player_right = None
         
-        if self.vlc_instance_left:
-            try:
-                self.vlc_instance_left.release()
-                print("Left VLC instance released")
-            except Exception as e:
-                print(f"Error during left VLC instance cleanup: {e}")
-            finally:
-                self.vlc_instance_left = None
-                
-        if self.vlc_instance_right:
+        for media_left, media_right in self.media_cache:
+            media_left.release()
+            media_right.release()
+        self.media_cache = []
+        
+        self._destroy_video_windows()
+        
+        if self.vlc_instance:
             try:
-                self.vlc_instance_right.release()
-                print("Right VLC instance released")
+                self.vlc_instance.release()
+                log.debug("VLC instance released")
             except Exception as e:
-                print(f"Error during right VLC instance cleanup: {e}")
+                log.error("Error during VLC instance cleanup: %s", e)
             finally:
-                self.vlc_instance_right = None
+                self.vlc_instance = None
+
+def apply_production_tuning():
+    """Switch to the performance CPU governor and run the calling thread with SCHED_FIFO priority.
+    Returns the governors that were replaced, for restore_cpu_governors()"""
+    saved_governors = {}
+    # No frequency ramp-up delay between an idle CPU and the motion trigger
+    for path in glob.glob(CPU_GOVERNOR_PATHS):
+        try:
+            with open(path) as f:
+                previous = f.read().strip()
+            with open(path, 'w') as f:
+                f.write('performance')
+            saved_governors[path] = previous
+        except OSError as e:
+            log.warning("Could not set performance CPU governor: %s", e)
+            break
+    else:
+        log.info("CPU governor set to performance")
+    
+    # Keep housekeeping tasks from preempting the motion -> playback path. Only this thread gets the
+    # real-time priority: SCHED_RESET_ON_FORK starts the threads libvlc creates from it (input, decoders,
+    # video output) with normal scheduling, so a software decode fallback can't starve Xorg or pigpiod.
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO | os.SCHED_RESET_ON_FORK, os.sched_param(SCHED_FIFO_PRIORITY))
+        log.info("Main loop running with SCHED_FIFO priority %s", SCHED_FIFO_PRIORITY)
+    except (OSError, AttributeError) as e:
+        log.warning("Could not set SCHED_FIFO scheduling: %s", e)
+    
+    return saved_governors
+
+def restore_cpu_governors(saved_governors):
+    """Put back the CPU governors replaced by apply_production_tuning()"""
+    for path, governor in saved_governors.items():
+        try:
+            with open(path, 'w') as f:
+                f.write(governor)
+        except OSError as e:
+            log.warning("Could not restore CPU governor %s: %s", governor, e)
+            return
+    if saved_governors:
+        log.info("CPU governor restored")
 
 def detect_motion():
     """Detect motion using PIR sensor"""
-    return GPIO.input(PIR_PIN)
+    return pir.is_active
+
+def on_motion():
+    """Motion sensor callback: wake up the main loop to play the videos"""
+    wake_up(MOTION_WAKEUP)
 
 def main():
     """Main function"""
@@ -420,100 +593,108 @@ def main():
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
+    # Signals also write to the self-pipe so they interrupt the wait in the main loop
+    signal.set_wakeup_fd(wake_write_fd)
+    saved_governors = {}
     
     try:
-        print("Initializing Halloween Dual Video Player...")
-        print(f"Python version: {subprocess.run(['python3', '--version'], capture_output=True, text=True).stdout.strip()}")
-        
-        # Check if VLC is available
-        try:
-            vlc.Instance()
-            print("VLC library is available")
-        except Exception as e:
-            print(f"Error: VLC not available. Please install VLC and python-vlc.")
-            print(f"Install with: pip install python-vlc")
-            return
+        log.info("Initializing Halloween Dual Video Player...")
+        log.debug("Python version: %s", sys.version.split()[0])
         
         # Configure display resolution and orientation
         configure_display('dual')
         
         # Initialize dual video player
-        print("Creating dual video player instance...")
+        log.debug("Creating dual video player instance...")
         player = DualVideoPlayer(VIDEO_SETS)
         if not player.initialized:
-            print("Dual video player failed to initialize. Exiting.")
+            log.error("Dual video player failed to initialize. Exiting.")
             return
         
-        print("Dual video player initialized successfully")
+        log.debug("Dual video player initialized successfully")
         
         # Show first frame initially
-        print("Attempting to show initial first frames...")
+        log.debug("Attempting to show initial first frames...")
         for attempt in range(3):  # Try up to 3 times
-            print(f"First frame attempt {attempt + 1}...")
+            log.debug("First frame attempt %s...", attempt + 1)
             if player.show_first_frame():
-                print("Initial first frames displayed successfully")
+                log.info("Initial first frames displayed successfully")
                 break
             else:
-                print(f"Attempt {attempt + 1} failed, retrying...")
-                time.sleep(2)
+                log.warning("Attempt %s failed, retrying...", attempt + 1)
         else:
-            print("Warning: Failed to show initial first frames after 3 attempts")
+            log.warning("Failed to show initial first frames after 3 attempts")
             # Continue anyway - maybe the videos will display when motion is detected
             
-        print("Showing first frames. Waiting for motion detection...")
-        print(f"Starting with video set {player.current_set_index + 1} of {len(VIDEO_SETS)}")
+        log.info("Showing first frames. Waiting for motion detection...")
+        log.info("Starting with video set %s of %s", player.current_set_index + 1, len(VIDEO_SETS))
+        
+        if PRODUCTION:
+            saved_governors = apply_production_tuning()
         
+        # Motion is delivered by the sensor's callback instead of polling the pin
+        pir.when_activated = on_motion
         last_trigger_time = 0
-        cooldown_period = 3  # Seconds to wait before allowing another trigger
-        last_debug_time = 0  # Track debug output timing
         
         while not shutdown_requested:
             try:
-                # Check for motion
-                motion_detected = detect_motion()
-                current_time = time.time()
+                # Sleep until motion (or a shutdown signal) arrives, waking up periodically for status output
+                if not wake_selector.select(timeout=STATUS_INTERVAL):
+                    # Skip reading the sensor at all unless the status line will be printed
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("Status: Motion=%s, Playing=%s, Video_set=%s", detect_motion(), player.is_playing, player.current_set_index + 1)
+                    continue
                 
-                # Check if motion detected and cooldown period has passed
-                if (motion_detected and 
-                    not player.is_playing and 
-                    current_time - last_trigger_time > cooldown_period):
-                    
-                    print("Motion detected - Playing dual videos!")
-                    last_trigger_time = current_time
+                wakeups = drain_wakeups()
+                if shutdown_requested:
+                    break
+                # Only motion starts playback - not a late libvlc event, e.g. the Stopped from loading a first frame
+                if MOTION_WAKEUP not in wakeups:
+                    continue
+                
+                # Ignore motion within the cooldown period of the last trigger
+                current_time = time.monotonic()
+                if current_time - last_trigger_time <= COOLDOWN_PERIOD:
+                    continue
+                last_trigger_time = current_time
+                
+                log.info("Motion detected - Playing dual videos!")
 
-                    # Play the videos (this will block until videos finish)
-                    player.play_video()
-                    
-                    # After videos finish, show the first frame of the next video set
-                    print(f"Videos finished. Now showing video set {player.current_set_index + 1}")
-                    if not player.show_first_frame():
-                        print("Warning: Failed to show first frames after video playback")
-                    else:
-                        print("Ready for next motion detection...")
+                # Play the videos (this will block until videos finish)
+                player.play_video()
+                if shutdown_requested:
+                    break
                 
-                # Debug output every 10 seconds to show status
-                if current_time - last_debug_time >= 10:
-                    print(f"Status: Motion={motion_detected}, Playing={player.is_playing}, Video_set={player.current_set_index + 1}")
-                    last_debug_time = current_time
+                # After videos finish, show the first frame of the next video set
+                log.info("Videos finished. Now showing video set %s", player.current_set_index + 1)
+                if not player.show_first_frame():
+                    log.warning("Failed to show first frames after video playback")
+                else:
+                    log.debug("Ready for next motion detection...")
                 
-                # Small delay to prevent excessive CPU usage
-                time.sleep(0.5)
+                # Ignore motion that happened while the videos were playing
+                drain_wakeups()
                 
             except KeyboardInterrupt:
-                print("\nShutting down...")
+                log.info("Shutting down...")
                 break
             except Exception as e:
-                print(f"Error in main loop: {e}")
+                log.error("Error in main loop: %s", e)
                 time.sleep(1)
+        
+        if shutdown_requested:
+            log.info("Received termination signal. Shutting down gracefully...")
                 
     except Exception as e:
-        print(f"Error initializing: {e}")
+        log.error("Error initializing: %s", e)
     finally:
         # Clean up
         if 'player' in locals():
             player.cleanup()
-        GPIO.cleanup()
-        print("Cleanup complete")
+        pir.close()
+        wake_selector.close()
+        restore_cpu_governors(saved_governors)
+        log.info("Cleanup complete")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
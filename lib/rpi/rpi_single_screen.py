@@ -4,57 +4,75 @@
 # Standard library imports
 import time
 import os
-import subprocess
+import selectors
 import signal
 import sys
+import threading
 
 # Third-party imports
 import vlc
 
-# Add the parent directory to the path so we can import from lib
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 # Local imports
-from common.configure_displays import configure_display
-
-# GPIO setup with fallback for non-RPi systems
-try:
-    import RPi.GPIO as GPIO
-except Exception:
-    # Allow running/testing on non-RPi systems by providing a dummy GPIO
-    class _DummyGPIO:
-        BCM = 'BCM'
-        IN = 'IN'
-
-        def setmode(self, mode):
-            print(f"DummyGPIO: setmode({mode})")
+if __package__:
+    # Run as a module (python -m lib.rpi.<script>) - regular package import
+    from ..common.configure_displays import configure_display
+    from ..common.video_files import video_exists
+    from ..common.motion_sensor import create_motion_sensor
+    from ..common.vlc_settings import VLC_HW_DECODE_ARGS
+else:
+    # Run as a script - add the parent directory to the path so we can import from lib
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common.configure_displays import configure_display
+    from common.video_files import video_exists
+    from common.motion_sensor import create_motion_sensor
+    from common.vlc_settings import VLC_HW_DECODE_ARGS
 
-        def setup(self, pin, mode):
-            print(f"DummyGPIO: setup(pin={pin}, mode={mode})")
+# Global flag for graceful shutdown
+shutdown_requested = False
 
-        def input(self, pin):
-            # For testing purposes, you can change this to return 1 to simulate motion
-            # or add logic to simulate motion detection
-            return 0
+# Self-pipe that wakes up the main thread: the motion sensor and libvlc end-of-playback callbacks
+# write to it, and so does Python's C-level signal handler once main() installs it with signal.set_wakeup_fd()
+wake_read_fd, wake_write_fd = os.pipe()
+os.set_blocking(wake_read_fd, False)
+os.set_blocking(wake_write_fd, False)
+wake_selector = selectors.DefaultSelector()
+wake_selector.register(wake_read_fd, selectors.EVENT_READ)
 
-        def cleanup(self):
-            print("DummyGPIO: cleanup()")
+MOTION_WAKEUP = b'm'    # written by the motion sensor callback
+PLAYBACK_WAKEUP = b'p'  # written by the libvlc end/error/stopped callbacks
 
-    GPIO = _DummyGPIO()
+def wake_up(reason):
+    """Wake up the main thread (called from the motion sensor and libvlc callback threads)"""
+    try:
+        os.write(wake_write_fd, reason)
+    except BlockingIOError:
+        pass  # Pipe already full of wake-ups - the main thread will wake anyway
 
-# Global flag for graceful shutdown
-shutdown_requested = False
+def drain_wakeups():
+    """Read and return the pending wake-ups (motion, playback and signal bytes) from the self-pipe"""
+    wakeups = b""
+    try:
+        while chunk := os.read(wake_read_fd, 4096):
+            wakeups += chunk
+    except BlockingIOError:
+        pass
+    return wakeups
 
 def signal_handler(signum, frame):
     """Handle termination signals gracefully"""
+    # Only set the flag: the handler runs between bytecodes of the main thread, so taking a lock here
+    # (print, threading.Event.set()) could deadlock against the code it interrupted.
+    # The main thread is woken through the set_wakeup_fd pipe, both when idle and during playback.
     global shutdown_requested
-    print(f"\nReceived signal {signum}. Shutting down gracefully...")
     shutdown_requested = True
 
-# GPIO setup
+# Motion sensor setup
 PIR_PIN = 14  # GPIO pin for PIR motion sensor
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(PIR_PIN, GPIO.IN)
+COOLDOWN_PERIOD = 3  # Seconds to wait before allowing another trigger
+STATUS_INTERVAL = 10  # Seconds between status outputs while idle
+FIRST_FRAME_TIMEOUT = 2.0  # Seconds to wait for the player to start when loading the first frame
+
+pir = create_motion_sensor(PIR_PIN)
 
 # Video configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -64,13 +82,20 @@ VIDEO_PATHS = [
     os.path.join(SCRIPT_DIR, "../../assets/videos/single_video_3_720x1280p.mp4")
 ]
 
-# Debug: Print the video paths to verify they're correct
+# Resolve the "../.." parts once so VLC and the existence checks get plain absolute paths
+VIDEO_PATHS = [os.path.abspath(path) for path in VIDEO_PATHS]
+
+# Debug: Print the video paths to verify they're correct (the stat results are reused by _check_videos)
 print(f"Script directory: {SCRIPT_DIR}")
 for i, path in enumerate(VIDEO_PATHS):
     print(f"Video {i+1} path: {path}")
-    print(f"Video {i+1} exists: {os.path.exists(path)}")
+    print(f"Video {i+1} exists: {video_exists(path)}")
 
 class SimpleVideoPlayer:
+    # Fixed attribute set: no per-instance __dict__, attribute access is a slot lookup
+    __slots__ = ('video_paths', 'current_video_index', 'is_playing', 'vlc_instance', 'vlc_player',
+                 'media_cache', 'playing', 'vout_ready', 'done', 'initialized')
+    
     def __init__(self, video_paths):
         print("Initializing SimpleVideoPlayer...")
         self.video_paths = video_paths
@@ -78,6 +103,13 @@ class SimpleVideoPlayer:
         self.is_playing = False
         self.vlc_instance = None
         self.vlc_player = None
+        self.media_cache = []  # One media per video, opened and parsed once
+        # Set from libvlc's event thread once the player has actually started playing
+        self.playing = threading.Event()
+        # Set from libvlc's event thread once a video output exists (i.e. a picture can be shown)
+        self.vout_ready = threading.Event()
+        # Set from libvlc's event thread when the player reaches the end (or fails)
+        self.done = threading.Event()
         
         # Check if video files exist
         print("Checking video files...")
@@ -93,24 +125,18 @@ class SimpleVideoPlayer:
         
     def _check_videos(self):
         """Check if all video files exist"""
-        for i, video_path in enumerate(self.video_paths):
-            if not os.path.exists(video_path):
-                print(f"Error: Video file not found at {video_path}")
-                return False
-            print(f"Video {i + 1} found: {video_path}")
+        # Report every missing file, not just the first
+        missing = [video_path for video_path in self.video_paths if not video_exists(video_path)]
+        for video_path in missing:
+            print(f"Error: Video file not found at {video_path}")
+        if missing:
+            return False
+        print(f"All {len(self.video_paths)} video(s) found")
         return True
     
     def _start_vlc_instance(self):
         """Start a VLC instance using python-vlc"""
         try:
-            # Check if VLC is available
-            try:
-                vlc.Instance()
-                print("VLC is available")
-            except Exception as e:
-                print(f"VLC is not available or not installed: {e}")
-                return False
-            
             # Create VLC instance with appropriate options
             self.vlc_instance = vlc.Instance([
                 '--intf', 'dummy',  # No interface
@@ -123,14 +149,38 @@ class SimpleVideoPlayer:
                 '--no-qt-privacy-ask',  # Don't ask for privacy settings
                 '--aout', 'alsa',   # Use ALSA audio output (common on Raspberry Pi)
                 # '--no-audio',
-                '--quiet'           # Reduce console output
+                '--file-caching=200',  # Local files need little read-ahead; start playback sooner
+                '--quiet',          # Reduce console output
+                *VLC_HW_DECODE_ARGS
             ])
+            if self.vlc_instance is None:
+                # python-vlc returns None when libvlc fails to initialize
+                print("Error: VLC not available. Please install VLC and python-vlc (pip install python-vlc).")
+                return False
             
             # Create media player
             self.vlc_player = self.vlc_instance.media_player_new()
             
             # Explicitly set fullscreen mode
             self.vlc_player.set_fullscreen(True)
+            
+            # Get notified by libvlc when playback really starts instead of guessing with a sleep
+            event_manager = self.vlc_player.event_manager()
+            event_manager.event_attach(vlc.EventType.MediaPlayerPlaying, lambda event: self.playing.set())
+            event_manager.event_attach(vlc.EventType.MediaPlayerVout, lambda event: self.vout_ready.set())
+            
+            # Get notified by libvlc when playback ends instead of polling the player state
+            for event_type in (vlc.EventType.MediaPlayerEndReached,
+                               vlc.EventType.MediaPlayerEncounteredError,
+                               vlc.EventType.MediaPlayerStopped):
+                event_manager.event_attach(event_type, lambda event: self._on_playback_end())
+            
+            # Open and parse every video once up front; playback just swaps the cached media in
+            for video_path in self.video_paths:
+                media = self.vlc_instance.media_new(video_path)
+                media.parse_with_options(vlc.MediaParseFlag.local, 0)
+                self.media_cache.append(media)
+            print(f"Cached media for {len(self.media_cache)} video(s)")
 
             # Set volume to 100% (VLC volume range is 0-100)
             self.vlc_player.audio_set_volume(100)
@@ -148,19 +198,28 @@ class SimpleVideoPlayer:
         if not self.initialized:
             return False
             
-        current_video = self.video_paths[self.current_video_index]
         print(f"Showing first frame of video {self.current_video_index + 1}")
         
         try:
-            # Create media for current video
-            media = self.vlc_instance.media_new(current_video)
-            self.vlc_player.set_media(media)
+            # Use the media cached for the current video
+            self.vlc_player.set_media(self.media_cache[self.current_video_index])
             
             # Start playing to load the first frame
+            self.playing.clear()
+            self.vout_ready.clear()
             self.vlc_player.play()
             
-            # Wait a moment for the video to start
-            time.sleep(0.5)
+            # Wait until the player is really playing (returns as soon as decoding starts)
+            if not self.playing.wait(timeout=FIRST_FRAME_TIMEOUT):
+                print(f"Video did not start within {FIRST_FRAME_TIMEOUT} seconds")
+                # Don't leave a late starter running - the idle screen would play the whole clip
+                self.vlc_player.stop()
+                return False
+            
+            # Don't pause before there is a picture on screen. libvlc keeps the video output across
+            # media of the same format, in which case has_vout() is already set and no event comes.
+            if not self.vlc_player.has_vout() and not self.vout_ready.wait(timeout=FIRST_FRAME_TIMEOUT):
+                print(f"Warning: No video output after {FIRST_FRAME_TIMEOUT} seconds, pausing anyway")
             
             # Pause to show only the first frame
             self.vlc_player.pause()
@@ -186,11 +245,11 @@ class SimpleVideoPlayer:
         self.is_playing = True
         
         try:
-            # Create media for current video
-            media = self.vlc_instance.media_new(current_video)
-            self.vlc_player.set_media(media)
+            # Use the media cached for the current video
+            self.vlc_player.set_media(self.media_cache[self.current_video_index])
             
             # Start playing
+            self.done.clear()
             self.vlc_player.play()
             
             # Wait for video to finish playing
@@ -205,28 +264,23 @@ class SimpleVideoPlayer:
             # Move to next video
             self._rotate_to_next_video()
     
+    def _on_playback_end(self):
+        """libvlc callback: mark the video as done and wake up the playback wait"""
+        self.done.set()
+        wake_up(PLAYBACK_WAKEUP)
+    
     def _wait_for_video_end(self):
         """Wait for current video to finish playing"""
         print("Waiting for video to finish...")
         
-        # Wait for the video to start
-        time.sleep(1)
-        
-        while not shutdown_requested and self.is_playing:
-            state = self.vlc_player.get_state()
-            
-            if state == vlc.State.Ended:
-                print("Video playback ended")
-                break
-            elif state == vlc.State.Error:
-                print("Video playback error")
-                break
-            elif state == vlc.State.Stopped:
-                print("Video playback stopped")
-                break
-                
-            # Check every 0.1 seconds
-            time.sleep(0.1)
+        # Sleep on the self-pipe: the end callback and shutdown signals both write to it
+        while not self.done.is_set():
+            if shutdown_requested:
+                print("Video playback interrupted by shutdown")
+                return
+            wake_selector.select()
+            drain_wakeups()  # motion during playback is ignored
+        print(f"Video playback ended ({self.vlc_player.get_state()})")
     
     def _rotate_to_next_video(self):
         """Move to the next video in the sequence"""
@@ -246,6 +300,10 @@ class SimpleVideoPlayer:
             finally:
                 self.vlc_player = None
         
+        for media in self.media_cache:
+            media.release()
+        self.media_cache = []
+        
         if self.vlc_instance:
             try:
                 self.vlc_instance.release()
@@ -257,7 +315,11 @@ class SimpleVideoPlayer:
 
 def detect_motion():
     """Detect motion using PIR sensor"""
-    return GPIO.input(PIR_PIN)
+    return pir.is_active
+
+def on_motion():
+    """Motion sensor callback: wake up the main loop to play the video"""
+    wake_up(MOTION_WAKEUP)
 
 def main():
     """Main function"""
@@ -266,19 +328,12 @@ def main():
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
+    # Signals also write to the self-pipe so they interrupt the wait in the main loop
+    signal.set_wakeup_fd(wake_write_fd)
     
     try:
         print("Initializing Simple Halloween Video Player...")
-        print(f"Python version: {subprocess.run(['python3', '--version'], capture_output=True, text=True).stdout.strip()}")
-        
-        # Check if VLC is available
-        try:
-            vlc.Instance()
-            print("VLC library is available")
-        except Exception as e:
-            print(f"Error: VLC not available. Please install VLC and python-vlc.")
-            print(f"Install with: pip install python-vlc")
-            return
+        print(f"Python version: {sys.version.split()[0]}")
         
         # Configure display resolution and orientation
         configure_display('single')
@@ -301,7 +356,6 @@ def main():
                 break
             else:
                 print(f"Attempt {attempt + 1} failed, retrying...")
-                time.sleep(2)
         else:
             print("Warning: Failed to show initial first frame after 3 attempts")
             # Continue anyway - maybe the video will display when motion is detected
@@ -309,41 +363,46 @@ def main():
         print("Showing first frame. Waiting for motion detection...")
         print(f"Starting with video {player.current_video_index + 1} of {len(VIDEO_PATHS)}")
         
+        # Motion is delivered by the sensor's callback instead of polling the pin
+        pir.when_activated = on_motion
         last_trigger_time = 0
-        cooldown_period = 3  # Seconds to wait before allowing another trigger
-        last_debug_time = 0  # Track debug output timing
         
         while not shutdown_requested:
             try:
-                # Check for motion
-                motion_detected = detect_motion()
-                current_time = time.time()
+                # Sleep until motion (or a shutdown signal) arrives, waking up periodically for status output
+                if not wake_selector.select(timeout=STATUS_INTERVAL):
+                    print(f"Status: Motion={detect_motion()}, Playing={player.is_playing}, Video={player.current_video_index + 1}")
+                    continue
+                
+                wakeups = drain_wakeups()
+                if shutdown_requested:
+                    break
+                # Only motion starts playback - not a late libvlc event, e.g. the Stopped from loading a first frame
+                if MOTION_WAKEUP not in wakeups:
+                    continue
                 
-                # Check if motion detected and cooldown period has passed
-                if (motion_detected and 
-                    not player.is_playing and 
-                    current_time - last_trigger_time > cooldown_period):
-                    
-                    print("Motion detected - Playing video!")
-                    last_trigger_time = current_time
+                # Ignore motion within the cooldown period of the last trigger
+                current_time = time.monotonic()
+                if current_time - last_trigger_time <= COOLDOWN_PERIOD:
+                    continue
+                last_trigger_time = current_time
+                
+                print("Motion detected - Playing video!")
 
-                    # Play the video (this will block until video finishes)
-                    player.play_video()
-                    
-                    # After video finishes, show the first frame of the next video
-                    print(f"Video finished. Now showing video {player.current_video_index + 1}")
-                    if not player.show_first_frame():
-                        print("Warning: Failed to show first frame after video playback")
-                    else:
-                        print("Ready for next motion detection...")
+                # Play the video (this will block until video finishes)
+                player.play_video()
+                if shutdown_requested:
+                    break
                 
-                # Debug output every 10 seconds to show status
-                if current_time - last_debug_time >= 10:
-                    print(f"Status: Motion={motion_detected}, Playing={player.is_playing}, Video={player.current_video_index + 1}")
-                    last_debug_time = current_time
+                # After video finishes, show the first frame of the next video
+                print(f"Video finished. Now showing video {player.current_video_index + 1}")
+                if not player.show_first_frame():
+                    print("Warning: Failed to show first frame after video playback")
+                else:
+                    print("Ready for next motion detection...")
                 
-                # Small delay to prevent excessive CPU usage
-                time.sleep(0.5)
+                # Ignore motion that happened while the video was playing
+                drain_wakeups()
                 
             except KeyboardInterrupt:
                 print("\nShutting down...")
@@ -351,6 +410,9 @@ def main():
             except Exception as e:
                 print(f"Error in main loop: {e}")
                 time.sleep(1)
+        
+        if shutdown_requested:
+            print("\nReceived termination signal. Shutting down gracefully...")
                 
     except Exception as e:
         print(f"Error initializing: {e}")
@@ -358,7 +420,8 @@ def main():
         # Clean up
         if 'player' in locals():
             player.cleanup()
-        GPIO.cleanup()
+        pir.close()
+        wake_selector.close()
         print("Cleanup complete")
 
 if __name__ == "__main__":
@@ -71,13 +71,22 @@ fi
 
 # Install required Python packages
 echo "Installing required Python packages..."
-pip3 install --user --break-system-packages opencv-python RPi.GPIO
+pip3 install --user --break-system-packages opencv-python gpiozero python-xlib
 
 # Install VLC media player and Python VLC bindings
 echo "Installing dependencies..."
 sudo apt update
 sudo apt install -y vlc python3-vlc xdotool
 
+# pigpio is optional (gpiozero falls back to its default GPIO backend) and isn't available
+# everywhere - e.g. pigpiod doesn't run on a Pi 5 - so don't let it abort the installation
+echo "Installing and enabling pigpio daemon (optional)..."
+if sudo apt install -y pigpio python3-pigpio && sudo systemctl enable --now pigpiod; then
+    echo "pigpio daemon enabled"
+else
+    echo "Warning: pigpio unavailable, using default GPIO backend"
+fi
+
 # Copy service file to systemd directory
 echo "Installing service file..."
 # Create a temporary service file with the correct script path